@@ -0,0 +1,67 @@
+-- Optional one-time setup: materialize the warehouse cost breakdown.
+--
+-- The heaviest query in the dashboard joins QUERY_HISTORY with
+-- QUERY_ATTRIBUTION_HISTORY over up to 30 days on every load (the 2-3 minute
+-- query behind the 30 Days tab). This script pre-computes the daily
+-- (day, warehouse, query type) breakdown into a small table refreshed hourly
+-- by a task, so the dashboard only reads a sub-second scan.
+--
+-- ACCOUNT_USAGE views are shared objects and cannot back a dynamic table,
+-- which is why a regular table plus a serverless-style task is used instead.
+--
+-- Replace <your_warehouse> with the warehouse that should run the refresh,
+-- then execute the whole script as a role that can create objects in
+-- SNOWFLAKE_INTELLIGENCE and read SNOWFLAKE.ACCOUNT_USAGE.
+--
+-- The dashboard automatically uses WAREHOUSE_COSTS_DAILY when it exists and
+-- falls back to the live ACCOUNT_USAGE join when it does not.
+
+CREATE SCHEMA IF NOT EXISTS SNOWFLAKE_INTELLIGENCE.COST_DASHBOARD;
+
+CREATE OR REPLACE TABLE SNOWFLAKE_INTELLIGENCE.COST_DASHBOARD.WAREHOUSE_COSTS_DAILY AS
+WITH cortex_warehouses AS (
+  SELECT DISTINCT warehouse_name
+  FROM snowflake.account_usage.query_history
+  WHERE start_time >= DATEADD(DAY, -31, CURRENT_DATE)
+    AND warehouse_name IS NOT NULL
+    AND query_tag IN ('cortex-agent', 'snowflake-intelligence')
+)
+SELECT
+  CAST(DATE_TRUNC('DAY', qh.start_time) AS DATE) AS day,
+  qh.warehouse_name,
+  CASE WHEN qh.query_tag IN ('cortex-agent', 'snowflake-intelligence')
+       THEN 'Cortex Analyst' ELSE 'Other Queries' END AS query_type,
+  COUNT(*) AS query_count,
+  SUM(COALESCE(qa.credits_attributed_compute, 0) + COALESCE(qa.credits_used_query_acceleration, 0)) AS total_credits
+FROM snowflake.account_usage.query_history qh
+INNER JOIN snowflake.account_usage.query_attribution_history qa ON qh.query_id = qa.query_id
+WHERE qh.start_time >= DATEADD(DAY, -31, CURRENT_DATE)
+  AND qh.warehouse_name IN (SELECT warehouse_name FROM cortex_warehouses)
+GROUP BY 1, 2, 3;
+
+CREATE OR REPLACE TASK SNOWFLAKE_INTELLIGENCE.COST_DASHBOARD.REFRESH_WAREHOUSE_COSTS_DAILY
+  WAREHOUSE = <your_warehouse>
+  SCHEDULE = '60 MINUTE'
+AS
+CREATE OR REPLACE TABLE SNOWFLAKE_INTELLIGENCE.COST_DASHBOARD.WAREHOUSE_COSTS_DAILY AS
+WITH cortex_warehouses AS (
+  SELECT DISTINCT warehouse_name
+  FROM snowflake.account_usage.query_history
+  WHERE start_time >= DATEADD(DAY, -31, CURRENT_DATE)
+    AND warehouse_name IS NOT NULL
+    AND query_tag IN ('cortex-agent', 'snowflake-intelligence')
+)
+SELECT
+  CAST(DATE_TRUNC('DAY', qh.start_time) AS DATE) AS day,
+  qh.warehouse_name,
+  CASE WHEN qh.query_tag IN ('cortex-agent', 'snowflake-intelligence')
+       THEN 'Cortex Analyst' ELSE 'Other Queries' END AS query_type,
+  COUNT(*) AS query_count,
+  SUM(COALESCE(qa.credits_attributed_compute, 0) + COALESCE(qa.credits_used_query_acceleration, 0)) AS total_credits
+FROM snowflake.account_usage.query_history qh
+INNER JOIN snowflake.account_usage.query_attribution_history qa ON qh.query_id = qa.query_id
+WHERE qh.start_time >= DATEADD(DAY, -31, CURRENT_DATE)
+  AND qh.warehouse_name IN (SELECT warehouse_name FROM cortex_warehouses)
+GROUP BY 1, 2, 3;
+
+ALTER TASK SNOWFLAKE_INTELLIGENCE.COST_DASHBOARD.REFRESH_WAREHOUSE_COSTS_DAILY RESUME;
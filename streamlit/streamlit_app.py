@@ -1,12 +1,19 @@
 # Import python packages
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime
 import json
-import plotly.express as px
 import plotly.graph_objects as go
 from snowflake.snowpark.context import get_active_session
 
+# orjson parses the agent_spec documents several times faster than the stdlib
+# json module; fall back silently when it is not in the environment
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Set page configuration
 st.set_page_config(
     page_title="Snowflake Intelligence Cost Dashboard",
@@ -98,51 +105,116 @@ def format_credits(credits):
     else:
         return f"{credits:.2f}"
 
+def format_credits_series(values):
+    """Vectorized format_credits for a whole column.
+
+    Buckets the values with boolean masks and formats each bucket with a
+    single np.char.mod call into a preallocated array - no per-element
+    Python format dispatch.
+    """
+    v = pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype='float64')
+    out = np.full(v.shape, '0.000', dtype=object)
+    small = (v != 0) & (v < 0.001)
+    mid = (v >= 0.001) & (v < 1)
+    big = v >= 1
+    out[small] = np.char.mod('%.6f', v[small])
+    out[mid] = np.char.mod('%.3f', v[mid])
+    out[big] = np.char.mod('%.2f', v[big])
+    return pd.Series(out, index=values.index)
+
+def format_cost_series(values, cost_per_credit):
+    """Vectorized format_cost for a whole column"""
+    cost = pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype='float64') * cost_per_credit
+    out = np.full(cost.shape, '$0.00', dtype=object)
+    tiny = (cost != 0) & (cost < 0.01)
+    rest = cost >= 0.01
+    out[tiny] = np.char.mod('$%.4f', cost[tiny])
+    out[rest] = np.char.mod('$%.2f', cost[rest])
+    return pd.Series(out, index=values.index)
+
 def create_metric(label, value, cost_per_credit, display_mode, help_text=""):
     """Helper function to create metrics with credit/cost toggle"""
     display_value = format_credits(value) if display_mode == "Credits" else format_cost(value, cost_per_credit)
     metric_label = f"{label} {'Credits' if display_mode == 'Credits' else 'Cost'}"
     return st.metric(metric_label, display_value, help=help_text)
 
+def create_metric_row(metrics, cost_per_credit, display_mode):
+    """Render a row of credit/cost metrics in one vectorized pass.
+
+    metrics is a list of (label, value, help_text) tuples. All values go
+    through the series formatters together, so a display-mode toggle costs
+    one numpy multiply for the whole row instead of per-metric Python math.
+    """
+    values = pd.Series([value for _, value, _ in metrics], dtype='float64')
+    if display_mode == "Credits":
+        formatted = format_credits_series(values)
+        suffix = "Credits"
+    else:
+        formatted = format_cost_series(values, cost_per_credit)
+        suffix = "Cost"
+
+    for col, (label, _, help_text), display_value in zip(st.columns(len(metrics)), metrics, formatted):
+        with col:
+            st.metric(f"{label} {suffix}", display_value, help=help_text)
+
+@st.cache_data(ttl=3*3600, show_spinner=False)
 def format_dataframe_for_display(df, credit_cols, display_mode, cost_per_credit):
-    """Helper function to format dataframes based on display mode"""
+    """Helper function to format dataframes based on display mode.
+
+    Cached so the credit->cost conversion and string formatting run once per
+    underlying frame; toggling the display mode then just swaps between two
+    already-built views instead of reformatting every table.
+    """
     display_df = df.copy()
     
     if display_mode == "Credits":
         for col in credit_cols:
             if col in display_df.columns:
-                display_df[col] = display_df[col].apply(format_credits)
+                display_df[col] = format_credits_series(display_df[col])
     else:
         for col in credit_cols:
             if col in display_df.columns:
                 cost_col = col.replace('CREDITS', 'COST').replace('_CREDITS', '_COST')
-                display_df[cost_col] = display_df[col].apply(lambda x: format_cost(x, cost_per_credit))
+                display_df[cost_col] = format_cost_series(display_df[col], cost_per_credit)
                 display_df = display_df.drop(col, axis=1)
     
     return display_df
 
+def _find_col(df, candidates):
+    """Return the first candidate column present in the frame, or None"""
+    for col in candidates:
+        if col in df.columns:
+            return col
+    return None
+
+@st.cache_resource(ttl=600)
 def get_agent_search_services():
-    """Extract all Cortex Search services used by agents"""
-    agents_data = get_agents()
+    """Extract all Cortex Search services used by agents.
+
+    Cached as a resource: the set and mapping are only ever read, and
+    st.cache_data would re-hash and deep-copy them on every lookup.
+    """
     all_agent_search_services = set()
     agent_service_mapping = {}
-    
-    if not agents_data.empty:
-        columns = list(agents_data.columns)
-        name_col = columns[1] if len(columns) > 1 else columns[0]
-        
-        for _, agent_row in agents_data.iterrows():
-            agent_name = agent_row[name_col]
-            tools_info = get_agent_details(agent_name)
-            
-            for service in tools_info['cortex_search_services']:
-                service_name = service['search_service']
-                all_agent_search_services.add(service_name)
-                if service_name not in agent_service_mapping:
-                    agent_service_mapping[service_name] = []
-                agent_service_mapping[service_name].append(agent_name)
-    
-    return all_agent_search_services, agent_service_mapping
+
+    for agent_name, tools_info in get_all_agent_tools().items():
+        for service in tools_info['cortex_search_services']:
+            service_name = service['search_service']
+            all_agent_search_services.add(service_name)
+            if service_name not in agent_service_mapping:
+                agent_service_mapping[service_name] = []
+            agent_service_mapping[service_name].append(agent_name)
+
+    # Pre-join the agent lists here so the breakdown table's map is a plain
+    # dict lookup instead of a sort-and-join per rerun
+    agent_service_mapping = {
+        service: ', '.join(sorted(agents))
+        for service, agents in agent_service_mapping.items()
+    }
+
+    # Return an Index rather than a set: pandas keeps the Index's hashtable
+    # alive, so the repeated isin() calls across tabs skip rebuilding one
+    return pd.Index(sorted(all_agent_search_services)), agent_service_mapping
 
 def apply_chart_styling(fig, title, x_label, y_label, display_mode):
     """Apply consistent styling to charts"""
@@ -154,78 +226,183 @@ def apply_chart_styling(fig, title, x_label, y_label, display_mode):
     )
     return fig
 
-@st.cache_data
-def get_warehouse_costs_breakdown(days):
-    """Get warehouse costs breakdown for cortex vs non-cortex queries - performance optimized"""
-    cost_query = f"""
-    WITH cortex_warehouses AS (
-      -- Step 1: Quickly identify warehouses with Cortex Analyst activity
-      SELECT DISTINCT warehouse_name
-      FROM snowflake.account_usage.query_history
-      WHERE start_time >= DATEADD(DAY, -{days}, CURRENT_DATE)
-        AND warehouse_name IS NOT NULL
-        AND query_tag IN ('cortex-agent', 'snowflake-intelligence')
-    ), filtered_queries AS (
-      -- Step 2: Get only queries from relevant warehouses (much smaller dataset)
-      SELECT
-        query_id,
-        warehouse_name,
-        CASE WHEN query_tag IN ('cortex-agent', 'snowflake-intelligence') THEN 1 ELSE 0 END AS is_cortex_query
-      FROM snowflake.account_usage.query_history
-      WHERE start_time >= DATEADD(DAY, -{days}, CURRENT_DATE)
-        AND warehouse_name IN (SELECT warehouse_name FROM cortex_warehouses)
-    ), query_with_credits AS (
-      -- Step 3: Join credits only for the filtered set (small join)
-      SELECT
-        fq.warehouse_name,
-        fq.is_cortex_query,
-        COALESCE(qa.credits_attributed_compute, 0) + COALESCE(qa.credits_used_query_acceleration, 0) AS total_credits
-      FROM filtered_queries fq
-      INNER JOIN snowflake.account_usage.query_attribution_history qa ON fq.query_id = qa.query_id
-    )
+# Plotly's SVG renderer stalls once a line trace reaches tens of thousands of
+# points; on accounts with per-minute Cortex Analyst usage the 30-day series
+# easily gets there. Anything beyond this many points is downsampled first.
+CHART_MAX_POINTS = 2000
+
+def lttb_downsample(x, y, n_out=CHART_MAX_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling for line charts.
+
+    Returns the positional indices of the points to keep. LTTB picks, per
+    bucket, the point forming the largest triangle with the previously kept
+    point and the next bucket's average, so peaks and dips survive while the
+    rendered point count drops to roughly the chart's pixel width. Pure
+    numpy because the Snowflake conda channel does not carry the usual
+    downsampling packages (tsdownsample / plotly-resampler).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # Bucket boundaries over the interior points; the first and last points
+    # are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    prev_idx = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if end <= start:
+            prev_idx = start
+            indices[i + 1] = start
+            continue
+
+        # Average of the following bucket (the final bucket averages against
+        # the last point)
+        next_start = edges[i + 1]
+        next_end = edges[i + 2] if i < n_out - 3 else n
+        if next_end <= next_start:
+            next_end = next_start + 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[prev_idx] - avg_x) * (y[start:end] - y[prev_idx])
+            - (x[prev_idx] - x[start:end]) * (avg_y - y[prev_idx])
+        )
+        prev_idx = start + int(area.argmax())
+        indices[i + 1] = prev_idx
+
+    return indices
+
+# All period tabs slice a single cached 30-day fetch per source instead of
+# re-scanning ACCOUNT_USAGE once per time window
+DASHBOARD_WINDOW_DAYS = 30
+
+def period_cutoff_date(days):
+    """Start date (inclusive) for a trailing window of the given length"""
+    return datetime.date.today() - datetime.timedelta(days=days)
+
+def dashboard_window_start():
+    """ISO start date of the 30-day fetch window.
+
+    Passed to the fetchers as a bind parameter instead of interpolating
+    CURRENT_DATE arithmetic into the SQL text: the query text stays
+    byte-identical for every user within a day, so Snowflake's result cache
+    can serve repeat fetches, and the st.cache_data keys roll over daily.
+    """
+    return period_cutoff_date(DASHBOARD_WINDOW_DAYS).isoformat()
+
+# Pre-aggregated breakdown maintained by sql/setup_warehouse_costs_materialization.sql
+WAREHOUSE_COSTS_TABLE = 'SNOWFLAKE_INTELLIGENCE.COST_DASHBOARD.WAREHOUSE_COSTS_DAILY'
+
+def compact_usage_frame(df, category_cols=(), count_cols=()):
+    """Shrink a fetched frame: categorical strings, downcast counts.
+
+    Categoricals turn the downstream pivot/isin/groupby work into
+    integer-code comparisons and cut the cached frame's memory severalfold.
+    Credit columns stay float64 so the 6-decimal credit display keeps full
+    precision.
+    """
+    for col in category_cols:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in count_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+def fetch_warehouse_costs_live(window_start):
+    """Run the live ACCOUNT_USAGE join when the materialized table is absent"""
+    # Single scan of query_history: the cortex/other split is pushed down as a
+    # grouping column and the relevant-warehouse restriction is a semi-join,
+    # instead of staging the same 30-day window through a chain of CTEs
+    cost_query = """
     SELECT
-      warehouse_name,
-      CASE WHEN is_cortex_query = 1 THEN 'Cortex Analyst' ELSE 'Other Queries' END AS query_type,
+      CAST(DATE_TRUNC('DAY', q.start_time) AS DATE) AS day,
+      q.warehouse_name,
+      IFF(q.query_tag IN ('cortex-agent', 'snowflake-intelligence'), 'Cortex Analyst', 'Other Queries') AS query_type,
       COUNT(*) AS query_count,
-      SUM(total_credits) AS total_credits
-    FROM query_with_credits
-    GROUP BY warehouse_name, is_cortex_query
-    ORDER BY warehouse_name, is_cortex_query DESC
+      SUM(COALESCE(qa.credits_attributed_compute, 0) + COALESCE(qa.credits_used_query_acceleration, 0)) AS total_credits
+    FROM snowflake.account_usage.query_history q
+    INNER JOIN snowflake.account_usage.query_attribution_history qa ON q.query_id = qa.query_id
+    WHERE q.start_time >= TO_DATE(?)
+      AND q.warehouse_name IN (
+        SELECT DISTINCT warehouse_name
+        FROM snowflake.account_usage.query_history
+        WHERE start_time >= TO_DATE(?)
+          AND warehouse_name IS NOT NULL
+          AND query_tag IN ('cortex-agent', 'snowflake-intelligence')
+      )
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
     """
-    
+
     try:
-        result = session.sql(cost_query).to_pandas()
+        result = session.sql(cost_query, params=[window_start, window_start]).to_pandas()
         return result
     except Exception as e:
         st.error(f"Could not fetch warehouse cost data: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data  
-def get_cortex_analyst_usage(days):
-    """Get Cortex Analyst usage history"""
-    usage_query = f"""
+@st.cache_data(persist='disk', show_spinner=False)
+def get_dashboard_raw_data(window_start):
+    """Fetch the four 30-day usage sources in a single concurrent batch.
+
+    Each query is submitted with to_pandas(block=False) so the round-trips
+    overlap on the Snowflake side; the first load pays the slowest fetch
+    instead of the sum of all four.
+
+    Persisted to disk so an app restart or redeploy reuses the last fetch
+    instead of re-running the minutes-long warehouse scan; the window_start
+    key rolls daily, bounding staleness (persist is incompatible with ttl).
+    """
+    # Warehouse costs: prefer the hourly-refreshed materialized table
+    # (sub-second scan); fall back to the live join when it is not set up
+    materialized_query = f"""
+    SELECT day, warehouse_name, query_type, query_count, total_credits
+    FROM {WAREHOUSE_COSTS_TABLE}
+    WHERE day >= TO_DATE(?)
+    ORDER BY day, warehouse_name, query_type
+    """
+
+    usage_query = """
     SELECT
+      TO_DATE(START_TIME) AS DAY,
       START_TIME,
       END_TIME,
       REQUEST_COUNT,
       CREDITS,
       USERNAME
     FROM SNOWFLAKE.ACCOUNT_USAGE.CORTEX_ANALYST_USAGE_HISTORY
-    WHERE START_TIME >= DATEADD(DAY, -{days}, CURRENT_DATE)
+    WHERE START_TIME >= TO_DATE(?)
     ORDER BY START_TIME DESC
     """
-    
-    try:
-        result = session.sql(usage_query).to_pandas()
-        return result
-    except Exception as e:
-        st.error(f"Could not fetch Cortex Analyst usage data: {str(e)}")
-        return pd.DataFrame()
 
-@st.cache_data
-def get_cortex_analyst_requests(days):
-    """Get Cortex Analyst requests"""
-    requests_query = f"""
+    search_query = """
+    SELECT
+      USAGE_DATE,
+      DATABASE_NAME,
+      SCHEMA_NAME,
+      SERVICE_NAME,
+      SERVICE_ID,
+      CONSUMPTION_TYPE,
+      CREDITS,
+      MODEL_NAME,
+      TOKENS
+    FROM SNOWFLAKE.ACCOUNT_USAGE.CORTEX_SEARCH_DAILY_USAGE_HISTORY
+    WHERE USAGE_DATE >= TO_DATE(?)
+    ORDER BY USAGE_DATE DESC, CREDITS DESC
+    """
+
+    requests_query = """
     SELECT
       timestamp,
       semantic_model_name,
@@ -233,16 +410,164 @@ def get_cortex_analyst_requests(days):
       latest_question,
       feedback
     FROM snowflake.local.CORTEX_ANALYST_REQUESTS_V
-    WHERE timestamp >= DATEADD(DAY, -{days}, CURRENT_DATE)
+    WHERE timestamp >= TO_DATE(?)
     ORDER BY timestamp DESC
     LIMIT 1000
     """
-    
+
+    warehouse_job = session.sql(materialized_query, params=[window_start]).to_pandas(block=False)
+    analyst_job = session.sql(usage_query, params=[window_start]).to_pandas(block=False)
+    search_job = session.sql(search_query, params=[window_start]).to_pandas(block=False)
+    requests_job = session.sql(requests_query, params=[window_start]).to_pandas(block=False)
+
     try:
-        result = session.sql(requests_query).to_pandas()
-        return result
+        warehouse_data = warehouse_job.result()
+    except Exception:
+        warehouse_data = fetch_warehouse_costs_live(window_start)
+
+    try:
+        analyst_data = analyst_job.result()
+    except Exception as e:
+        st.error(f"Could not fetch Cortex Analyst usage data: {str(e)}")
+        analyst_data = pd.DataFrame()
+
+    try:
+        search_data = search_job.result()
+    except Exception as e:
+        st.error(f"Could not fetch Cortex Search usage data: {str(e)}")
+        search_data = pd.DataFrame()
+
+    try:
+        # Arrow-backed dtypes keep the wide text columns (questions, feedback)
+        # compact and let st.dataframe serialize them without an object-dtype
+        # round-trip back through Arrow
+        requests_data = requests_job.result().convert_dtypes(dtype_backend='pyarrow')
     except Exception as e:
         st.error(f"Could not fetch Cortex Analyst requests data: {str(e)}")
+        requests_data = pd.DataFrame()
+
+    warehouse_data = compact_usage_frame(
+        warehouse_data,
+        category_cols=['WAREHOUSE_NAME', 'QUERY_TYPE'],
+        count_cols=['QUERY_COUNT'])
+    analyst_data = compact_usage_frame(
+        analyst_data,
+        category_cols=['USERNAME'],
+        count_cols=['REQUEST_COUNT'])
+    search_data = compact_usage_frame(
+        search_data,
+        category_cols=['DATABASE_NAME', 'SCHEMA_NAME', 'SERVICE_NAME', 'CONSUMPTION_TYPE', 'MODEL_NAME'],
+        count_cols=['TOKENS'])
+
+    return warehouse_data, analyst_data, search_data, requests_data
+
+def get_warehouse_costs_breakdown(days):
+    """Get warehouse costs breakdown for cortex vs non-cortex queries"""
+    raw, _, _, _ = get_dashboard_raw_data(dashboard_window_start())
+    if raw.empty:
+        return raw
+
+    window = raw[raw['DAY'] >= period_cutoff_date(days)]
+    return (window.groupby(['WAREHOUSE_NAME', 'QUERY_TYPE'], as_index=False, observed=True)
+                  .agg({'QUERY_COUNT': 'sum', 'TOTAL_CREDITS': 'sum'}))
+
+def get_cortex_analyst_usage(days):
+    """Get Cortex Analyst usage history for the requested window"""
+    _, raw, _, _ = get_dashboard_raw_data(dashboard_window_start())
+    if raw.empty:
+        return raw
+
+    window = raw[raw['DAY'] >= period_cutoff_date(days)]
+    return window.drop(columns='DAY')
+
+@st.cache_data(ttl=3*3600, show_spinner=False)
+def get_cortex_analyst_summary(window_start):
+    """Aggregate Cortex Analyst totals server-side for one window.
+
+    The period metrics only need three scalars; Snowflake reduces the
+    history before shipping anything, so one row crosses the wire instead
+    of the row-level frame.
+    """
+    summary_query = """
+    SELECT
+      COALESCE(SUM(CREDITS), 0) AS CREDITS,
+      COALESCE(SUM(REQUEST_COUNT), 0) AS REQUEST_COUNT,
+      COUNT(DISTINCT USERNAME) AS UNIQUE_USERS
+    FROM SNOWFLAKE.ACCOUNT_USAGE.CORTEX_ANALYST_USAGE_HISTORY
+    WHERE START_TIME >= TO_DATE(?)
+    """
+
+    try:
+        row = session.sql(summary_query, params=[window_start]).collect()[0]
+        return {
+            'credits': float(row['CREDITS']),
+            'request_count': int(row['REQUEST_COUNT']),
+            'unique_users': int(row['UNIQUE_USERS'])
+        }
+    except Exception as e:
+        st.error(f"Could not fetch Cortex Analyst usage data: {str(e)}")
+        return {'credits': 0.0, 'request_count': 0, 'unique_users': 0}
+
+def get_cortex_analyst_requests(days):
+    """Get Cortex Analyst requests for the requested window.
+
+    Slices the batched 30-day fetch: the rows arrive newest-first, so
+    trimming to a shorter window gives the same result the narrower query
+    would have returned.
+    """
+    _, _, _, raw = get_dashboard_raw_data(dashboard_window_start())
+    if raw.empty:
+        return raw
+
+    ts_col = _find_col(raw, ['timestamp', 'TIMESTAMP'])
+    if ts_col is None:
+        return raw
+    # Compare on dates: the view's TIMESTAMP_LTZ column arrives tz-aware,
+    # so a naive Timestamp comparison would raise. This mirrors how the
+    # other sources slice their DAY/USAGE_DATE columns.
+    return raw[raw[ts_col].dt.date >= period_cutoff_date(days)]
+
+@st.cache_data(ttl=3*3600, show_spinner=False)
+def get_analyst_requests_by_model(window_start):
+    """Count Cortex Analyst requests per semantic model server-side.
+
+    Snowflake aggregates before shipping anything, so a handful of rows
+    cross the wire, and unlike the LIMIT-1000 raw sample the counts cover
+    every request in the window.
+    """
+    query = """
+    SELECT semantic_model_name, COUNT(*) AS REQUEST_COUNT
+    FROM snowflake.local.CORTEX_ANALYST_REQUESTS_V
+    WHERE timestamp >= TO_DATE(?)
+      AND semantic_model_name IS NOT NULL
+    GROUP BY 1
+    ORDER BY 2 DESC
+    """
+
+    try:
+        result = session.sql(query, params=[window_start]).to_pandas()
+        return result.convert_dtypes(dtype_backend='pyarrow')
+    except Exception as e:
+        st.error(f"Could not fetch requests-by-model summary: {str(e)}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=3*3600, show_spinner=False)
+def get_analyst_requests_by_user(window_start):
+    """Count Cortex Analyst requests per user server-side"""
+    query = """
+    SELECT user_name, COUNT(*) AS REQUEST_COUNT
+    FROM snowflake.local.CORTEX_ANALYST_REQUESTS_V
+    WHERE timestamp >= TO_DATE(?)
+      AND user_name IS NOT NULL
+    GROUP BY 1
+    ORDER BY 2 DESC
+    """
+
+    try:
+        result = session.sql(query, params=[window_start]).to_pandas()
+        return result.convert_dtypes(dtype_backend='pyarrow')
+    except Exception as e:
+        st.error(f"Could not fetch requests-by-user summary: {str(e)}")
         return pd.DataFrame()
 
 @st.cache_data
@@ -252,121 +577,229 @@ def get_agents():
         agents_data = session.sql("""
             SHOW AGENTS IN SCHEMA SNOWFLAKE_INTELLIGENCE.AGENTS
         """).to_pandas()
-        return agents_data
+        # Arrow-backed strings serialize straight through st.dataframe's
+        # Arrow encoder instead of round-tripping object dtype
+        return agents_data.convert_dtypes(dtype_backend='pyarrow')
     except Exception as e:
         st.error(f"Error fetching agents: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data
-def get_agent_details(agent_name):
-    """Get detailed agent information including tools"""
+def parse_agent_spec(agent_spec_json):
+    """Parse an agent_spec JSON document into tool configuration info"""
+    tools_info = {
+        'cortex_analyst_tools': [],
+        'cortex_search_services': []
+    }
+
+    if not agent_spec_json:
+        return tools_info
+
     try:
-        describe_query = f"DESCRIBE AGENT SNOWFLAKE_INTELLIGENCE.AGENTS.{agent_name}"
-        agent_details = session.sql(describe_query).to_pandas()
-        
-        if not agent_details.empty:
-            # Parse the agent_spec JSON to find tools
-            agent_spec_col = list(agent_details.columns)[6]  # agent_spec is typically at index 6
-            agent_spec_json = agent_details.iloc[0][agent_spec_col]
-            
-            if agent_spec_json:
-                try:
-                    spec = json.loads(agent_spec_json)
-                    
-                    # Extract all tools info
-                    tools_info = {
-                        'cortex_analyst_tools': [],
-                        'cortex_search_services': []
-                    }
-                    
-                    if 'tools' in spec:
-                        for tool in spec['tools']:
-                            if 'tool_spec' in tool:
-                                tool_spec = tool['tool_spec']
-                                tool_type = tool_spec.get('type')
-                                tool_name = tool_spec.get('name', 'Unknown')
-                                
-                                if tool_type == 'cortex_analyst_text_to_sql':
-                                    # Get warehouse and semantic view
-                                    warehouse = 'Not specified'
-                                    semantic_view = 'Not specified'
-                                    
-                                    if 'tool_resources' in spec and tool_name in spec['tool_resources']:
-                                        tool_resource = spec['tool_resources'][tool_name]
-                                        semantic_view = tool_resource.get('semantic_view', 'Not specified')
-                                        
-                                        if 'execution_environment' in tool_resource:
-                                            exec_env = tool_resource['execution_environment']
-                                            if exec_env.get('type') == 'warehouse':
-                                                warehouse = exec_env.get('warehouse', 'Not specified')
-                                    
-                                    tools_info['cortex_analyst_tools'].append({
-                                        'name': tool_name,
-                                        'warehouse': warehouse,
-                                        'semantic_view': semantic_view
-                                    })
-                                
-                                elif tool_type == 'cortex_search':
-                                    # Extract Cortex Search service info from tool_resources
-                                    search_service = 'Unknown'
-                                    
-                                    if 'tool_resources' in spec and tool_name in spec['tool_resources']:
-                                        tool_resource = spec['tool_resources'][tool_name]
-                                        # The actual search service name is in the 'name' field
-                                        search_service = tool_resource.get('name', 'Unknown')
-                                        
-                                        # If we have the full qualified name, extract just the service name part
-                                        if search_service != 'Unknown' and '.' in search_service:
-                                            # Extract just the service name (last part after the last dot)
-                                            service_name_parts = search_service.split('.')
-                                            simple_service_name = service_name_parts[-1]
-                                        else:
-                                            simple_service_name = search_service
-                                    else:
-                                        search_service = tool_name
-                                        simple_service_name = tool_name
-                                    
-                                    tools_info['cortex_search_services'].append({
-                                        'name': tool_name,
-                                        'search_service': simple_service_name,
-                                        'full_service_name': search_service
-                                    })
-                    
-                    return tools_info
-                    
-                except json.JSONDecodeError:
-                    return {'cortex_analyst_tools': [], 'cortex_search_services': []}
-        
-        return {'cortex_analyst_tools': [], 'cortex_search_services': []}
-    except Exception as e:
-        st.error(f"Error getting agent details: {str(e)}")
-        return {'cortex_analyst_tools': [], 'cortex_search_services': []}
+        spec = orjson.loads(agent_spec_json) if orjson is not None else json.loads(agent_spec_json)
+    except ValueError:
+        return tools_info
 
-@st.cache_data
-def get_cortex_search_usage(days):
-    """Get Cortex Search usage history"""
-    search_query = f"""
+    if 'tools' in spec:
+        for tool in spec['tools']:
+            if 'tool_spec' in tool:
+                tool_spec = tool['tool_spec']
+                tool_type = tool_spec.get('type')
+                tool_name = tool_spec.get('name', 'Unknown')
+
+                if tool_type == 'cortex_analyst_text_to_sql':
+                    # Get warehouse and semantic view
+                    warehouse = 'Not specified'
+                    semantic_view = 'Not specified'
+
+                    if 'tool_resources' in spec and tool_name in spec['tool_resources']:
+                        tool_resource = spec['tool_resources'][tool_name]
+                        semantic_view = tool_resource.get('semantic_view', 'Not specified')
+
+                        if 'execution_environment' in tool_resource:
+                            exec_env = tool_resource['execution_environment']
+                            if exec_env.get('type') == 'warehouse':
+                                warehouse = exec_env.get('warehouse', 'Not specified')
+
+                    tools_info['cortex_analyst_tools'].append({
+                        'name': tool_name,
+                        'warehouse': warehouse,
+                        'semantic_view': semantic_view
+                    })
+
+                elif tool_type == 'cortex_search':
+                    # Extract Cortex Search service info from tool_resources
+                    search_service = 'Unknown'
+
+                    if 'tool_resources' in spec and tool_name in spec['tool_resources']:
+                        tool_resource = spec['tool_resources'][tool_name]
+                        # The actual search service name is in the 'name' field
+                        search_service = tool_resource.get('name', 'Unknown')
+
+                        # If we have the full qualified name, extract just the service name part
+                        if search_service != 'Unknown' and '.' in search_service:
+                            # Extract just the service name (last part after the last dot)
+                            service_name_parts = search_service.split('.')
+                            simple_service_name = service_name_parts[-1]
+                        else:
+                            simple_service_name = search_service
+                    else:
+                        search_service = tool_name
+                        simple_service_name = tool_name
+
+                    tools_info['cortex_search_services'].append({
+                        'name': tool_name,
+                        'search_service': simple_service_name,
+                        'full_service_name': search_service
+                    })
+
+    return tools_info
+
+def parse_tool_resource(resource_json):
+    """Parse a tool_resources entry returned as a VARIANT JSON string"""
+    if not resource_json:
+        return {}
+    try:
+        return orjson.loads(resource_json) if orjson is not None else json.loads(resource_json)
+    except ValueError:
+        return {}
+
+def fetch_agent_tools_flattened():
+    """Extract every agent's tools in a single SQL pass, or None if unsupported.
+
+    LATERAL FLATTEN over the SHOW AGENTS output makes Snowflake traverse the
+    agent_spec JSON server-side, replacing one DESCRIBE AGENT round-trip per
+    agent. Returns None when the SHOW output carries no agent_spec column so
+    the caller can fall back to per-agent DESCRIBEs.
+    """
+    show_job = session.sql("SHOW AGENTS IN SCHEMA SNOWFLAKE_INTELLIGENCE.AGENTS").collect_nowait()
+    show_rows = show_job.result()
+
+    if not show_rows:
+        return {}
+    if 'agent_spec' not in show_rows[0].as_dict():
+        return None
+
+    flatten_query = f"""
     SELECT
-      USAGE_DATE,
-      DATABASE_NAME,
-      SCHEMA_NAME,
-      SERVICE_NAME,
-      SERVICE_ID,
-      CONSUMPTION_TYPE,
-      CREDITS,
-      MODEL_NAME,
-      TOKENS
-    FROM SNOWFLAKE.ACCOUNT_USAGE.CORTEX_SEARCH_DAILY_USAGE_HISTORY
-    WHERE USAGE_DATE >= DATEADD(DAY, -{days}, CURRENT_DATE)
-    ORDER BY USAGE_DATE DESC, CREDITS DESC
+      s."name" AS agent_name,
+      t.value:tool_spec:type::string AS tool_type,
+      t.value:tool_spec:name::string AS tool_name,
+      GET(PARSE_JSON(s."agent_spec"):tool_resources, t.value:tool_spec:name) AS tool_resource
+    FROM TABLE(RESULT_SCAN('{show_job.query_id}')) s,
+         LATERAL FLATTEN(input => PARSE_JSON(s."agent_spec"):tools, outer => TRUE) t
     """
-    
+
+    agent_tools = {}
+    for row in session.sql(flatten_query).collect():
+        tools_info = agent_tools.setdefault(row['AGENT_NAME'], {
+            'cortex_analyst_tools': [],
+            'cortex_search_services': []
+        })
+
+        tool_type = row['TOOL_TYPE']
+        tool_name = row['TOOL_NAME'] or 'Unknown'
+        tool_resource = parse_tool_resource(row['TOOL_RESOURCE'])
+
+        if tool_type == 'cortex_analyst_text_to_sql':
+            warehouse = 'Not specified'
+            semantic_view = tool_resource.get('semantic_view', 'Not specified')
+
+            exec_env = tool_resource.get('execution_environment', {})
+            if exec_env.get('type') == 'warehouse':
+                warehouse = exec_env.get('warehouse', 'Not specified')
+
+            tools_info['cortex_analyst_tools'].append({
+                'name': tool_name,
+                'warehouse': warehouse,
+                'semantic_view': semantic_view
+            })
+
+        elif tool_type == 'cortex_search':
+            if tool_resource:
+                # The actual search service name is in the 'name' field
+                search_service = tool_resource.get('name', 'Unknown')
+                if search_service != 'Unknown' and '.' in search_service:
+                    # Extract just the service name (last part after the last dot)
+                    simple_service_name = search_service.split('.')[-1]
+                else:
+                    simple_service_name = search_service
+            else:
+                search_service = tool_name
+                simple_service_name = tool_name
+
+            tools_info['cortex_search_services'].append({
+                'name': tool_name,
+                'search_service': simple_service_name,
+                'full_service_name': search_service
+            })
+
+    return agent_tools
+
+@st.cache_resource(ttl=600)
+def get_all_agent_tools():
+    """Map of agent name to parsed tools info for every agent in the account.
+
+    Cached as a resource so per-agent lookups are plain dict access instead
+    of a cache hash plus deep copy of the nested tool lists.
+    """
+    # One SHOW + LATERAL FLATTEN round-trip covers every agent when the SHOW
+    # output exposes agent_spec; otherwise describe each agent asynchronously
     try:
-        result = session.sql(search_query).to_pandas()
-        return result
-    except Exception as e:
-        st.error(f"Could not fetch Cortex Search usage data: {str(e)}")
-        return pd.DataFrame()
+        agent_tools = fetch_agent_tools_flattened()
+        if agent_tools is not None:
+            return agent_tools
+    except Exception:
+        pass
+
+    agents_data = get_agents()
+    agent_tools = {}
+
+    if not agents_data.empty:
+        columns = list(agents_data.columns)
+        name_col = columns[1] if len(columns) > 1 else columns[0]
+
+        # Fire all DESCRIBE AGENT statements as async jobs so the round-trips
+        # overlap, instead of paying one full round-trip per agent
+        describe_jobs = []
+        for _, agent_row in agents_data.iterrows():
+            agent_name = agent_row[name_col]
+            describe_query = f"DESCRIBE AGENT SNOWFLAKE_INTELLIGENCE.AGENTS.{agent_name}"
+            describe_jobs.append((agent_name, session.sql(describe_query).collect_nowait()))
+
+        for agent_name, job in describe_jobs:
+            try:
+                rows = job.result()
+                agent_spec_json = rows[0][6] if rows else None  # agent_spec is typically at index 6
+            except Exception:
+                agent_spec_json = None
+            agent_tools[agent_name] = parse_agent_spec(agent_spec_json)
+
+    return agent_tools
+
+def get_agent_details(agent_name):
+    """Get detailed agent information including tools"""
+    return get_all_agent_tools().get(agent_name, parse_agent_spec(None))
+
+def get_cortex_search_usage(days):
+    """Get Cortex Search usage history for the requested window"""
+    _, _, raw, _ = get_dashboard_raw_data(dashboard_window_start())
+    if raw.empty:
+        return raw
+
+    return raw[raw['USAGE_DATE'] >= period_cutoff_date(days)]
+
+@st.cache_data(ttl=3*3600, show_spinner=False)
+def count_unique_analyst_users(days, window_start):
+    """Distinct Cortex Analyst users in the window, cached as a scalar so
+    every rerun of the usage tab skips the nunique scan"""
+    usage = get_cortex_analyst_usage(days)
+    return int(usage['USERNAME'].nunique()) if not usage.empty else 0
+
+@st.cache_data(ttl=3*3600, show_spinner=False)
+def count_search_services(days, window_start):
+    """Distinct Cortex Search services with usage in the window"""
+    search = get_cortex_search_usage(days)
+    return int(search['SERVICE_NAME'].nunique()) if not search.empty else 0
 
 # Get Snowflake edition for cost estimation
 edition = get_snowflake_edition()
@@ -432,229 +865,292 @@ with st.expander("📚 Learn more about Snowflake Intelligence costs", expanded=
     For current pricing information, see the [Snowflake Consumption Table](https://www.snowflake.com/legal-files/CreditConsumptionTable.pdf).
     """)
 
-# Create tabs for different time periods and data views
-tab1, tab3, tab7, tab30, tab_agents, tab_search, tab5, tab6 = st.tabs([
-    "📅 1 Day", "📅 3 Days", "📅 7 Days", "📅 30 Days",
+# Agent inventory and search-service mapping are shared across tabs; fetch
+# them once per run instead of re-hitting the cache (hash plus dataframe
+# copy) in every tab body
+agents_data = get_agents()
+all_agent_search_services, agent_service_mapping = get_agent_search_services()
+
+# Create tabs for the data views; the time periods share a single tab with a
+# period selector so only the selected window is rendered per rerun
+tab_periods, tab_agents, tab_search, tab5, tab6 = st.tabs([
+    "📅 Period Costs",
     "🤖 All Agents", "🔍 Cortex Search", "📊 Cortex Analyst Usage", "📋 Raw Requests Data"
 ])
 
+# (days, label, spinner message) for the period selector
+PERIOD_OPTIONS = [
+    (1, "1 Day", '🚀 Calculating fresh 1-day Snowflake Intelligence insights...'),
+    (3, "3 Days", '✨ Crunching 3-day trends...'),
+    (7, "7 Days", '✨ Exploring 7-day patterns...'),
+    (30, "30 Days", '⏳ Aggregating 30-day history... please wait...'),
+]
+
 # Function to render period tab content
-def render_period_tab(days, period_name, display_mode, cost_per_credit):
-    st.markdown(f"### 📊 Costs for Last {period_name}")
-    
-    # Get data
+@st.cache_data(ttl=3*3600, show_spinner=False)
+def compute_period_data(days, window_start, all_agent_search_services):
+    """Compute the numeric frames and totals for one period window.
+
+    Keyed on the window only - not on display mode - so toggling between
+    credits and estimated cost re-renders from this cache instead of
+    re-slicing and re-aggregating the usage frames.
+    """
     warehouse_data = get_warehouse_costs_breakdown(days)
-    cortex_usage_data = get_cortex_analyst_usage(days)
     search_usage_data = get_cortex_search_usage(days)
-    
-    # Get agent search services for matching
-    all_agent_search_services, _ = get_agent_search_services()
-    
-    # Calculate totals
-    warehouse_cortex_credits = 0
-    warehouse_other_credits = 0
-    cortex_analyst_credits = cortex_usage_data['CREDITS'].sum() if not cortex_usage_data.empty else 0
-    cortex_search_credits = 0
-    
+    analyst_summary = get_cortex_analyst_summary(period_cutoff_date(days).isoformat())
+
+    data = {
+        'warehouse_cortex_credits': 0,
+        'cortex_analyst_credits': analyst_summary['credits'],
+        'cortex_search_credits': 0,
+        'warehouse_has_data': not warehouse_data.empty,
+        'cortex_warehouses': None,
+        'warehouse_table': None,
+        'agent_search_summary': None,
+        'has_analyst_usage': analyst_summary['request_count'] > 0,
+        'total_requests': analyst_summary['request_count'],
+        'unique_users': analyst_summary['unique_users'],
+    }
+
+    # Warehouse totals and per-warehouse breakdown - only warehouses with
+    # Cortex Analyst activity are shown
     if not warehouse_data.empty:
         cortex_mask = warehouse_data['QUERY_TYPE'] == 'Cortex Analyst'
-        other_mask = warehouse_data['QUERY_TYPE'] == 'Other Queries'
-        warehouse_cortex_credits = warehouse_data[cortex_mask]['TOTAL_CREDITS'].sum()
-        warehouse_other_credits = warehouse_data[other_mask]['TOTAL_CREDITS'].sum()
-    
-    # Calculate Cortex Search credits for agent services only
-    if not search_usage_data.empty and all_agent_search_services:
-        agent_search_data = search_usage_data[
-            search_usage_data['SERVICE_NAME'].isin(all_agent_search_services)
-        ]
-        cortex_search_credits = agent_search_data['CREDITS'].sum()
-    
-    # Total Snowflake Intelligence cost = all three components
-    total_snowflake_intelligence_credits = warehouse_cortex_credits + cortex_analyst_credits + cortex_search_credits
-    
-    # Display metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        create_metric("💰 Total Snowflake Intelligence", total_snowflake_intelligence_credits, cost_per_credit, display_mode, 
-                     "Total credits/cost for all Snowflake Intelligence services: Cortex Analyst + Warehouse + Cortex Search")
-    
-    with col2:
-        create_metric("🤖 Cortex Analyst", cortex_analyst_credits, cost_per_credit, display_mode,
-                     "Credits/cost for text-to-SQL generation")
-    
-    with col3:
-        create_metric("🏭 Warehouse", warehouse_cortex_credits, cost_per_credit, display_mode,
-                     "Credits/cost for the SQL query execution")
-    
-    with col4:
-        create_metric("🔍 Cortex Search", cortex_search_credits, cost_per_credit, display_mode,
-                     "Credits/cost for search services used by Cortex Agents")
-    
-    # Warehouse breakdown chart and table - only show warehouses with Cortex Analyst activity
-    if not warehouse_data.empty:
-        # Prepare data for stacked bar chart and filter for warehouses with Cortex Analyst activity
+        data['warehouse_cortex_credits'] = warehouse_data[cortex_mask]['TOTAL_CREDITS'].sum()
+
         pivot_data = warehouse_data.pivot(index='WAREHOUSE_NAME', columns='QUERY_TYPE', values='TOTAL_CREDITS').fillna(0)
-        
-        # Only keep warehouses that have Cortex Analyst credits > 0
+
         if 'Cortex Analyst' in pivot_data.columns:
             cortex_warehouses = pivot_data[pivot_data['Cortex Analyst'] > 0]
-            
+
             if not cortex_warehouses.empty:
-                st.markdown("#### 📈 Warehouse Credits Breakdown")
-                
-                fig = go.Figure()
-                
-                # Prepare y-values based on display mode
-                cortex_y_values = cortex_warehouses['Cortex Analyst']
-                other_y_values = cortex_warehouses['Other Queries'] if 'Other Queries' in cortex_warehouses.columns else pd.Series([0]*len(cortex_warehouses))
-                
-                if display_mode == "Estimated Cost":
-                    cortex_y_values = cortex_y_values * cost_per_credit
-                    other_y_values = other_y_values * cost_per_credit
-                
-                fig.add_trace(go.Bar(
-                    name='Cortex Analyst',
-                    x=cortex_warehouses.index,
-                    y=cortex_y_values,
-                    marker_color='#29B5E8'
-                ))
-                
-                if 'Other Queries' in cortex_warehouses.columns:
-                    fig.add_trace(go.Bar(
-                        name='Other Queries',
-                        x=cortex_warehouses.index,
-                        y=other_y_values,
-                        marker_color='#11567F'
-                    ))
-                
-                apply_chart_styling(fig, f"Warehouse Usage Breakdown - Last {period_name}", "Warehouse", "Credits Used", display_mode)
-                fig.update_layout(barmode='stack')
-                
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Detailed breakdown table - one row per warehouse
-                st.markdown("#### 📋 Detailed Warehouse Breakdown")
-                
-                # Create warehouse breakdown table
-                table_data = []
-                for warehouse in cortex_warehouses.index:
-                    cortex_credits = cortex_warehouses.loc[warehouse, 'Cortex Analyst']
-                    other_credits = cortex_warehouses.loc[warehouse, 'Other Queries'] if 'Other Queries' in cortex_warehouses.columns else 0
-                    
-                    # Get query counts efficiently
-                    warehouse_rows = warehouse_data[warehouse_data['WAREHOUSE_NAME'] == warehouse]
-                    cortex_queries_count = warehouse_rows[warehouse_rows['QUERY_TYPE'] == 'Cortex Analyst']['QUERY_COUNT'].iloc[0] if len(warehouse_rows[warehouse_rows['QUERY_TYPE'] == 'Cortex Analyst']) > 0 else 0
-                    other_queries_count = warehouse_rows[warehouse_rows['QUERY_TYPE'] == 'Other Queries']['QUERY_COUNT'].iloc[0] if len(warehouse_rows[warehouse_rows['QUERY_TYPE'] == 'Other Queries']) > 0 else 0
-                    
-                    table_data.append({
-                        'WAREHOUSE_NAME': warehouse,
-                        'CORTEX_ANALYST_CREDITS': cortex_credits,
-                        'OTHER_CREDITS': other_credits,
-                        'CORTEX_ANALYST_QUERIES': cortex_queries_count,
-                        'OTHER_QUERIES': other_queries_count
-                    })
-                
-                # Format table for display
-                table_df = pd.DataFrame(table_data)
-                formatted_df = format_dataframe_for_display(table_df, ['CORTEX_ANALYST_CREDITS', 'OTHER_CREDITS'], display_mode, cost_per_credit)
-                st.dataframe(formatted_df, use_container_width=True, hide_index=True)
-                
-            else:
-                st.info(f"💡 No Cortex Analyst activity found for the last {period_name}.")
-        else:
-            st.info(f"💡 No Cortex Analyst activity found for the last {period_name}.")
+                data['cortex_warehouses'] = cortex_warehouses
+
+                # Build the table with a single groupby/unstack instead of
+                # re-scanning warehouse_data with boolean masks per warehouse
+                agg = (warehouse_data.groupby(['WAREHOUSE_NAME', 'QUERY_TYPE'], observed=True)
+                                     .agg(credits=('TOTAL_CREDITS', 'sum'), queries=('QUERY_COUNT', 'sum'))
+                                     .unstack('QUERY_TYPE', fill_value=0)
+                                     .reindex(cortex_warehouses.index, fill_value=0))
+
+                data['warehouse_table'] = pd.DataFrame({
+                    'WAREHOUSE_NAME': agg.index,
+                    'CORTEX_ANALYST_CREDITS': agg.get(('credits', 'Cortex Analyst'), 0),
+                    'OTHER_CREDITS': agg.get(('credits', 'Other Queries'), 0),
+                    'CORTEX_ANALYST_QUERIES': agg.get(('queries', 'Cortex Analyst'), 0),
+                    'OTHER_QUERIES': agg.get(('queries', 'Other Queries'), 0)
+                }).reset_index(drop=True)
+
+    # Cortex Search credits for agent services only: aggregate the full frame
+    # in one hashed pass, then filter the small per-service summary, instead
+    # of masking every row first and grouping the copy
+    if not search_usage_data.empty and len(all_agent_search_services) > 0:
+        service_summary = search_usage_data.groupby('SERVICE_NAME', observed=True, as_index=False)['CREDITS'].sum()
+        service_summary = service_summary[service_summary['SERVICE_NAME'].isin(all_agent_search_services)]
+        data['cortex_search_credits'] = service_summary['CREDITS'].sum()
+
+        if not service_summary.empty:
+            data['agent_search_summary'] = service_summary.sort_values('CREDITS', ascending=False)
+
+    # Total Snowflake Intelligence cost = all three components
+    data['total_credits'] = (data['warehouse_cortex_credits']
+                             + data['cortex_analyst_credits']
+                             + data['cortex_search_credits'])
+    return data
+
+@st.cache_data(ttl=3*3600, show_spinner=False)
+def build_warehouse_fig(days, period_name, display_mode, cost_per_credit, window_start, all_agent_search_services):
+    """Build the stacked warehouse bar chart for one period window.
+
+    Cached on the same keys as the underlying data plus display mode, so
+    reruns reuse the serialized figure instead of re-running Plotly's
+    Python-side figure construction.
+    """
+    data = compute_period_data(days, window_start, all_agent_search_services)
+    cortex_warehouses = data['cortex_warehouses']
+    if cortex_warehouses is None:
+        return None
+
+    fig = go.Figure()
+
+    # Prepare y-values based on display mode
+    cortex_y_values = cortex_warehouses['Cortex Analyst']
+    other_y_values = cortex_warehouses['Other Queries'] if 'Other Queries' in cortex_warehouses.columns else pd.Series([0]*len(cortex_warehouses))
+
+    if display_mode == "Estimated Cost":
+        cortex_y_values = cortex_y_values * cost_per_credit
+        other_y_values = other_y_values * cost_per_credit
+
+    fig.add_trace(go.Bar(
+        name='Cortex Analyst',
+        x=cortex_warehouses.index,
+        y=cortex_y_values,
+        marker_color='#29B5E8'
+    ))
+
+    if 'Other Queries' in cortex_warehouses.columns:
+        fig.add_trace(go.Bar(
+            name='Other Queries',
+            x=cortex_warehouses.index,
+            y=other_y_values,
+            marker_color='#11567F'
+        ))
+
+    apply_chart_styling(fig, f"Warehouse Usage Breakdown - Last {period_name}", "Warehouse", "Credits Used", display_mode)
+    # uirevision keeps the client from recomputing zoom/pan state on redraw
+    fig.update_layout(barmode='stack', uirevision='keep')
+    return fig
+
+@st.cache_resource(ttl=3*3600, show_spinner=False)
+def build_usage_fig(days, data_key, display_mode, cost_per_credit):
+    """Build the Usage Over Time trace for the analyst usage tab.
+
+    data_key is a cheap (last timestamp, row count) fingerprint of the
+    underlying frame, so reruns with unchanged data reuse the built figure
+    without hashing the DataFrame itself.
+    """
+    usage_data = get_cortex_analyst_usage(days)
+
+    # The unit change is a numpy multiply on a view of the credits column;
+    # no copy of the usage frame is made
+    if display_mode == "Estimated Cost":
+        y_vals = usage_data['CREDITS'].to_numpy(dtype='float64') * cost_per_credit
+        title = "Cortex Analyst Cost Over Time"
+    else:
+        y_vals = usage_data['CREDITS'].to_numpy(dtype='float64')
+        title = "Cortex Analyst Credits Over Time"
+    x_vals = usage_data['START_TIME']
+
+    # Keep the rendered trace at O(CHART_MAX_POINTS) points
+    if len(y_vals) > CHART_MAX_POINTS:
+        keep = lttb_downsample(x_vals.astype('int64').to_numpy(), y_vals)
+        x_vals = x_vals.iloc[keep]
+        y_vals = y_vals[keep]
+
+    # go.Scattergl renders through WebGL instead of the SVG DOM,
+    # which keeps pan/zoom responsive on long traces
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=x_vals,
+        y=y_vals,
+        mode='lines',
+        line=dict(color='#29B5E8'),
+        name=title
+    ))
+    apply_chart_styling(fig, title, "Time", "Credits Used", display_mode)
+    return fig
+
+def render_period_tab(days, period_name, display_mode, cost_per_credit, all_agent_search_services):
+    """Render one period window; all heavy work lives in compute_period_data"""
+    st.markdown(f"### 📊 Costs for Last {period_name}")
+
+    data = compute_period_data(days, dashboard_window_start(), all_agent_search_services)
+
+    # Display metrics, formatted as one batch
+    create_metric_row([
+        ("💰 Total Snowflake Intelligence", data['total_credits'],
+         "Total credits/cost for all Snowflake Intelligence services: Cortex Analyst + Warehouse + Cortex Search"),
+        ("🤖 Cortex Analyst", data['cortex_analyst_credits'],
+         "Credits/cost for text-to-SQL generation"),
+        ("🏭 Warehouse", data['warehouse_cortex_credits'],
+         "Credits/cost for the SQL query execution"),
+        ("🔍 Cortex Search", data['cortex_search_credits'],
+         "Credits/cost for search services used by Cortex Agents"),
+    ], cost_per_credit, display_mode)
+
+    # Warehouse breakdown chart and table - only show warehouses with Cortex Analyst activity
+    if data['cortex_warehouses'] is not None:
+        st.markdown("#### 📈 Warehouse Credits Breakdown")
+
+        fig = build_warehouse_fig(days, period_name, display_mode, cost_per_credit,
+                                  dashboard_window_start(), all_agent_search_services)
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        # Detailed breakdown table - one row per warehouse
+        st.markdown("#### 📋 Detailed Warehouse Breakdown")
+        formatted_df = format_dataframe_for_display(data['warehouse_table'], ['CORTEX_ANALYST_CREDITS', 'OTHER_CREDITS'], display_mode, cost_per_credit)
+        st.dataframe(formatted_df, use_container_width=True, hide_index=True)
+
+    elif data['warehouse_has_data']:
+        st.info(f"💡 No Cortex Analyst activity found for the last {period_name}.")
     else:
         st.info(f"💡 No warehouse activity found for the last {period_name}.")
-    
+
     # Cortex Search details if any found
-    if cortex_search_credits > 0:
+    if data['cortex_search_credits'] > 0 and data['agent_search_summary'] is not None:
         st.markdown("#### 🔍 Cortex Search Services (Used by Agents)")
-        agent_search_data = search_usage_data[
-            search_usage_data['SERVICE_NAME'].isin(all_agent_search_services)
-        ]
-        
-        if not agent_search_data.empty:
-            # Show services used by agents
-            service_summary = agent_search_data.groupby('SERVICE_NAME')['CREDITS'].sum().reset_index()
-            service_summary = service_summary.sort_values('CREDITS', ascending=False)
-            
-            formatted_summary = format_dataframe_for_display(service_summary, ['CREDITS'], display_mode, cost_per_credit)
-            st.dataframe(formatted_summary, use_container_width=True, hide_index=True)
-    
+        formatted_summary = format_dataframe_for_display(data['agent_search_summary'], ['CREDITS'], display_mode, cost_per_credit)
+        st.dataframe(formatted_summary, use_container_width=True, hide_index=True)
+
     # Cortex Analyst usage summary
-    if not cortex_usage_data.empty:
+    if data['has_analyst_usage']:
         st.markdown("#### 🤖 Cortex Analyst Usage Summary")
         col1, col2 = st.columns(2)
-        
-        with col1:
-            total_requests = cortex_usage_data['REQUEST_COUNT'].sum()
-            st.metric("Total Requests", f"{total_requests:,}")
-        
-        with col2:
-            unique_users = cortex_usage_data['USERNAME'].nunique()
-            st.metric("Unique Users", str(unique_users))
 
-# Render period tabs with lazy loading
-with tab1:
-    with st.spinner('🚀 Calculating fresh 1-day Snowflake Intelligence insights...'):
-        render_period_tab(1, "1 Day", display_mode, cost_per_credit)
+        with col1:
+            st.metric("Total Requests", f"{data['total_requests']:,}")
 
-with tab3:
-    with st.spinner('✨ Crunching 3-day trends...'):
-        render_period_tab(3, "3 Days", display_mode, cost_per_credit)
+        with col2:
+            st.metric("Unique Users", str(data['unique_users']))
 
-with tab7:
-    with st.spinner('✨ Exploring 7-day patterns...'):
-        render_period_tab(7, "7 Days", display_mode, cost_per_credit)
+# Render only the selected period: Streamlit executes every tab body on each
+# rerun, so separate period tabs would pull data for all four windows even
+# when the user is looking at one
+with tab_periods:
+    active_period = st.radio(
+        "Time Period:",
+        PERIOD_OPTIONS,
+        format_func=lambda option: option[1],
+        horizontal=True,
+        key="active_period"
+    )
+    days, period_name, spinner_message = active_period
 
-with tab30:
-    # Show performance warning before loading
-    if not st.session_state['loaded_periods']['30d']:
+    # Show performance warning before the first heavy load
+    if days == 30 and not st.session_state['loaded_periods']['30d']:
         st.warning("🐌 **Performance Notice:** Loading 30-day analysis... This may take 2-3 minutes due to large data volumes.")
-    
-    # Auto-load when tab is activated
-    with st.spinner('⏳ Aggregating 30-day history... please wait...'):
-        render_period_tab(30, "30 Days", display_mode, cost_per_credit)
-        st.session_state['loaded_periods']['30d'] = True
+
+    with st.spinner(spinner_message):
+        render_period_tab(days, period_name, display_mode, cost_per_credit, all_agent_search_services)
+        if days == 30:
+            st.session_state['loaded_periods']['30d'] = True
 
 # All Agents Tab
 with tab_agents:
     st.markdown("### 🤖 All Cortex Agents in Account")
-    
-    agents_data = get_agents()
-    
+
     if not agents_data.empty:
         st.write(f"**Total Agents Found:** {len(agents_data)}")
         
         # Get the actual column names
         columns = list(agents_data.columns)
         name_col = columns[1] if len(columns) > 1 else columns[0]
-        
+
+        # Clean up descriptions and created timestamps for the whole frame in
+        # one vectorized pass instead of per-row pd.isna/strip/float calls
+        # inside the expander loop
+        comments = created = None
+        if len(columns) > 5:
+            comment_col = columns[5]  # 'comment' is at index 5
+            created_col = columns[0]  # 'created_on' is at index 0
+            owner_col = columns[4]    # 'owner' is at index 4
+
+            comments = (agents_data[comment_col].fillna('').astype(str).str.strip()
+                        .replace('', 'No description available'))
+            try:
+                created = pd.to_datetime(agents_data[created_col].astype(float), unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
+            except (TypeError, ValueError):
+                created = agents_data[created_col].astype(str)
+
         # Agent details expansion
-        for _, agent_row in agents_data.iterrows():
+        for idx, agent_row in agents_data.iterrows():
             agent_name = agent_row[name_col]
-            
+
             with st.expander(f"🤖 Agent: {agent_name}", expanded=False):
                 # Basic agent info
-                if len(columns) > 5:
-                    comment_col = columns[5]  # 'comment' is at index 5
-                    created_col = columns[0]  # 'created_on' is at index 0
-                    owner_col = columns[4]    # 'owner' is at index 4
-                    
-                    comment = agent_row[comment_col]
-                    if pd.isna(comment) or not str(comment).strip():
-                        comment = 'No description available'
-                    st.write(f"**Description:** {comment}")
-                    
-                    # Convert timestamp to readable date
-                    try:
-                        created_timestamp = float(agent_row[created_col])
-                        created_date = datetime.datetime.fromtimestamp(created_timestamp)
-                        st.write(f"**Created:** {created_date.strftime('%Y-%m-%d %H:%M:%S')}")
-                    except:
-                        st.write(f"**Created:** {agent_row[created_col]}")
-                    
+                if comments is not None:
+                    st.write(f"**Description:** {comments[idx]}")
+                    st.write(f"**Created:** {created[idx]}")
                     st.write(f"**Owner:** {agent_row[owner_col]}")
                 
                 # Get detailed tool configuration
@@ -691,15 +1187,14 @@ with tab_search:
     
     period_days = st.selectbox("Select Time Period:", [7, 1, 3, 30], index=0, key="search_period")
     
-    # Get search usage data and agent services
+    # Get search usage data; agent services were fetched once above the tabs
     search_usage_data = get_cortex_search_usage(period_days)
-    all_agent_search_services, agent_service_mapping = get_agent_search_services()
     
     if not search_usage_data.empty:
         # Filter search usage to only show services used by agents
         agent_search_usage = search_usage_data[
             search_usage_data['SERVICE_NAME'].isin(all_agent_search_services)
-        ] if all_agent_search_services else pd.DataFrame()
+        ] if len(all_agent_search_services) > 0 else pd.DataFrame()
         
         # Calculate totals
         total_search_credits = agent_search_usage['CREDITS'].sum() if not agent_search_usage.empty else 0
@@ -721,27 +1216,24 @@ with tab_search:
                      help="Number of Cortex Search services used by agents")
         
         with col4:
-            st.metric("📊 Total Services", str(search_usage_data['SERVICE_NAME'].nunique()),
+            st.metric("📊 Total Services", str(count_search_services(period_days, dashboard_window_start())),
                      help="Total number of Cortex Search services in account")
         
         # Show agent-related search services
         if not agent_search_usage.empty:
             st.markdown("#### 🤖 Search Services Used by Agents")
             
-            # Group by service and show which agents use it
-            service_breakdown = []
-            for service_name in agent_search_usage['SERVICE_NAME'].unique():
-                service_data = agent_search_usage[agent_search_usage['SERVICE_NAME'] == service_name]
-                agents_using = agent_service_mapping.get(service_name, [])
-                
-                service_breakdown.append({
-                    'SERVICE_NAME': service_name,
-                    'AGENTS_USING': ', '.join(agents_using),
-                    'TOTAL_CREDITS': service_data['CREDITS'].sum(),
-                    'USAGE_DAYS': service_data['USAGE_DATE'].nunique()
-                })
-            
-            breakdown_df = pd.DataFrame(service_breakdown)
+            # Group by service in one pandas pass and map in the agents
+            # using each service
+            breakdown_df = agent_search_usage.groupby(
+                'SERVICE_NAME', sort=False, observed=True
+            ).agg(
+                TOTAL_CREDITS=('CREDITS', 'sum'),
+                USAGE_DAYS=('USAGE_DATE', 'nunique')
+            ).reset_index()
+            breakdown_df.insert(1, 'AGENTS_USING', breakdown_df['SERVICE_NAME'].map(
+                lambda s: agent_service_mapping.get(s, '')
+            ))
             breakdown_df = breakdown_df.sort_values('TOTAL_CREDITS', ascending=False)
             
             # Format and display table
@@ -755,41 +1247,48 @@ with tab_search:
         
         else:
             # Debug: Show what services we're looking for vs what's available
-            if all_agent_search_services:
+            if len(all_agent_search_services) > 0:
                 st.warning("⚠️ Found agent search services but no matching usage data.")
-                st.markdown("**🔍 Debugging Service Matching:**")
-                
-                col_debug1, col_debug2 = st.columns(2)
-                
-                with col_debug1:
-                    st.markdown("**Services from Agents:**")
-                    for service in sorted(all_agent_search_services):
-                        st.write(f"- `{service}`")
-                
-                with col_debug2:
-                    st.markdown("**Available in Usage History:**")
-                    if not search_usage_data.empty:
-                        available_services = sorted(search_usage_data['SERVICE_NAME'].unique())
-                        for service in available_services[:10]:  # Show first 10
-                            match_status = "✅" if service in all_agent_search_services else "❌"
-                            st.write(f"{match_status} `{service}`")
-                        if len(available_services) > 10:
-                            st.write(f"... and {len(available_services)-10} more")
-                    else:
-                        st.write("No usage data available")
+
+                # Rendering dozens of widgets per rerun is expensive, so the
+                # debug detail stays collapsed until someone opens it
+                with st.expander("🔍 Debug service matching", expanded=False):
+                    col_debug1, col_debug2 = st.columns(2)
+
+                    with col_debug1:
+                        st.markdown("**Services from Agents:**")
+                        st.markdown("\n".join(
+                            f"- `{service}`" for service in sorted(all_agent_search_services)
+                        ))
+
+                    with col_debug2:
+                        st.markdown("**Available in Usage History:**")
+                        if not search_usage_data.empty:
+                            available_services = sorted(search_usage_data['SERVICE_NAME'].unique())
+                            agent_set = set(all_agent_search_services)
+                            # Show first 10, in a single message
+                            lines = [f"{'✅' if service in agent_set else '❌'} `{service}`"
+                                     for service in available_services[:10]]
+                            if len(available_services) > 10:
+                                lines.append(f"... and {len(available_services)-10} more")
+                            st.markdown("\n\n".join(lines))
+                        else:
+                            st.write("No usage data available")
             else:
                 st.info("No Cortex Agents found with Cortex Search services configured.")
     
     else:
         st.info(f"No Cortex Search usage data found for the last {period_days} days.")
 
-# Cortex Analyst Usage Tab
-with tab5:
+# Cortex Analyst Usage Tab. Scoped to a fragment so changing the period
+# selector reruns only this block instead of the whole script.
+@st.fragment
+def _render_analyst_usage_tab(display_mode, cost_per_credit):
     st.markdown("### 🤖 Cortex Analyst Usage Details")
-    
+
     period_days = st.selectbox("Select Time Period:", [7, 1, 3, 30], index=0, key="usage_period")
     usage_data = get_cortex_analyst_usage(period_days)
-    
+
     if not usage_data.empty:
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -802,7 +1301,7 @@ with tab5:
             st.metric("🔢 Total Requests", f"{usage_data['REQUEST_COUNT'].sum():,}")
         
         with col3:
-            st.metric("👥 Unique Users", str(usage_data['USERNAME'].nunique()))
+            st.metric("👥 Unique Users", str(count_unique_analyst_users(period_days, dashboard_window_start())))
         
         with col4:
             avg_credits_per_request = total_credits / usage_data['REQUEST_COUNT'].sum() if usage_data['REQUEST_COUNT'].sum() > 0 else 0
@@ -811,25 +1310,8 @@ with tab5:
         # Usage over time chart
         st.markdown("#### 📈 Usage Over Time")
         if len(usage_data) > 1:
-            # Prepare chart data based on display mode
-            chart_data = usage_data.copy()
-            if display_mode == "Estimated Cost":
-                chart_data['DISPLAY_VALUES'] = chart_data['CREDITS'] * cost_per_credit
-                y_column = 'DISPLAY_VALUES'
-                title = "Cortex Analyst Cost Over Time"
-            else:
-                chart_data['DISPLAY_VALUES'] = chart_data['CREDITS']
-                y_column = 'DISPLAY_VALUES'
-                title = "Cortex Analyst Credits Over Time"
-            
-            fig = px.line(
-                chart_data,
-                x='START_TIME',
-                y=y_column,
-                title=title,
-                color_discrete_sequence=['#29B5E8']
-            )
-            apply_chart_styling(fig, title, "Time", "Credits Used", display_mode)
+            data_key = (int(usage_data['START_TIME'].max().value), len(usage_data))
+            fig = build_usage_fig(period_days, data_key, display_mode, cost_per_credit)
             st.plotly_chart(fig, use_container_width=True)
         
         # Detailed usage table
@@ -839,53 +1321,50 @@ with tab5:
     else:
         st.info(f"💡 No Cortex Analyst usage found for the last {period_days} days.")
 
-# Raw Requests Data Tab  
-with tab6:
+# Raw Requests Data Tab, likewise isolated behind its own fragment
+@st.fragment
+def _render_raw_requests_tab(display_mode, cost_per_credit):
     st.markdown("### 📋 Cortex Analyst Requests Raw Data")
-    
+
     period_days = st.selectbox("Select Time Period:", [7, 1, 3, 30], index=0, key="requests_period")
     requests_data = get_cortex_analyst_requests(period_days)
-    
+
     if not requests_data.empty:
         st.write(f"**Total Requests:** {len(requests_data):,}")
         st.write(f"**Date Range:** Last {period_days} days")
         
-        # Summary by semantic model
+        # Summaries are aggregated server-side: tiny result sets, and they
+        # cover the full window rather than the LIMIT-1000 raw sample
         st.markdown("#### 📊 Requests by Semantic Model")
-        semantic_col = None
-        for col in ['semantic_model_name', 'SEMANTIC_MODEL_NAME']:
-            if col in requests_data.columns:
-                semantic_col = col
-                break
-        
-        if semantic_col and not requests_data[semantic_col].isna().all():
-            model_summary = requests_data[requests_data[semantic_col].notna()].groupby([semantic_col]).size().reset_index(name='REQUEST_COUNT')
-            model_summary = model_summary.sort_values('REQUEST_COUNT', ascending=False)
+        model_summary = get_analyst_requests_by_model(period_cutoff_date(period_days).isoformat())
+        if not model_summary.empty:
             st.dataframe(model_summary, use_container_width=True, hide_index=True)
         else:
             st.info("No semantic model data available.")
-        
-        # Summary by user
+
         st.markdown("#### 👤 Requests by User")
-        user_col = None
-        for col in ['user_name', 'USER_NAME']:
-            if col in requests_data.columns:
-                user_col = col
-                break
-                
-        if user_col and not requests_data[user_col].isna().all():
-            user_summary = requests_data[requests_data[user_col].notna()].groupby([user_col]).size().reset_index(name='REQUEST_COUNT')
-            user_summary = user_summary.sort_values('REQUEST_COUNT', ascending=False)
+        user_summary = get_analyst_requests_by_user(period_cutoff_date(period_days).isoformat())
+        if not user_summary.empty:
             st.dataframe(user_summary, use_container_width=True, hide_index=True)
         else:
             st.info("No user data available.")
         
-        # Raw requests table
+        # Raw requests table: kept collapsed and row-capped so the wide text
+        # columns are only shipped to the browser on demand
         st.markdown("#### 📋 Raw Requests Data")
-        st.dataframe(requests_data, use_container_width=True, hide_index=True)
+        with st.expander(f"Show raw rows ({len(requests_data):,})", expanded=False):
+            row_cap = st.slider("Rows to display:", min_value=100, max_value=1000,
+                                value=1000, step=100, key="requests_row_cap")
+            st.dataframe(requests_data.head(row_cap), use_container_width=True, hide_index=True)
     else:
         st.info(f"💡 No Cortex Analyst requests found for the last {period_days} days.")
 
+with tab5:
+    _render_analyst_usage_tab(display_mode, cost_per_credit)
+
+with tab6:
+    _render_raw_requests_tab(display_mode, cost_per_credit)
+
 # Footer
 st.markdown("---")
 st.markdown(f"""